@@ -1,31 +1,235 @@
 import socket
 import json
+import struct
+import time
 import pygame
 
+try:
+    # Optional speedup; same API shape as the stdlib fallback below
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    def json_dumps(obj):
+        """Serialize obj to UTF-8 JSON bytes."""
+        return json.dumps(obj).encode("utf-8")
+
+    json_loads = json.loads
+
 SERVER_HOST = "127.0.0.1"
 SERVER_PORT = 8765  # or 8765 if you didn't change it
 
 MAP_WIDTH = 800
 MAP_HEIGHT = 600
 
+# --- Wire protocol (must match server.py) ---
+MSG_WELCOME = 1
+MSG_STATE = 2
+MSG_DELTA = 3
+
+FRAME_HEADER = struct.Struct(">I")      # frame length
+STATE_HEADER = struct.Struct("<BHH")    # msg type, player count, coin count
+PLAYER_STRUCT = struct.Struct("<Iffi")  # id, x, y, score
+COIN_STRUCT = struct.Struct("<Iff")     # id, x, y
+
+DELTA_HEADER = struct.Struct("<BHHHH")  # msg type, changed, removed players, removed coins, added coins
+DELTA_PLAYER = struct.Struct("<IB")     # id, flags
+SMALL_MOVE = struct.Struct("<bb")       # dx, dy in 1/DELTA_SCALE pixels
+FULL_MOVE = struct.Struct("<ff")        # x, y
+SCORE_STRUCT = struct.Struct("<i")      # score
+ID_STRUCT = struct.Struct("<I")         # player or coin id
+
+DELTA_SMALL = 1
+DELTA_FULL = 2
+DELTA_SCORE = 4
+DELTA_SCALE = 4
+
 # --- Global state ---
 
+# Reconstructed server state: full snapshots replace it, deltas patch it
 world_state = {
-    "coins": [],
+    "players": {},   # player id -> {"id", "x", "y", "score"}
+    "coins": {},     # coin id -> {"id", "x", "y"}
 }
 
 my_id = None
 
 # Interpolation state: per-player
-# player_id -> {"x_prev":..., "y_prev":..., "x":..., "y":..., "t":..., "score":...}
+# player_id -> Entity
 entity_state = {}
-INTERP_DURATION = 0.1  # seconds over which we blend positions
+# Seconds over which we blend positions. This starts at the server's tick
+# interval and then follows the measured interval between state updates.
+INTERP_DURATION = 0.05
+INTERP_SMOOTHING = 0.1  # EMA weight given to each new interval sample
+# Each sample is clamped to these multiples of the current estimate, so a
+# client stall (window drag, minimise, GC pause) can't balloon the blend
+# window but it can still converge to whatever rate the server sends.
+INTERP_MIN_RATIO = 0.5
+INTERP_MAX_RATIO = 2.0
+
+# Input bitmask (must match server.py)
+KEY_UP = 1
+KEY_DOWN = 2
+KEY_LEFT = 4
+KEY_RIGHT = 8
+
+# Each physical key sets its own bit: WASD in the low nibble, arrows in the
+# high nibble, so releasing one of a pair doesn't cancel the other.
+KEY_BINDINGS = {
+    pygame.K_w: KEY_UP,
+    pygame.K_s: KEY_DOWN,
+    pygame.K_a: KEY_LEFT,
+    pygame.K_d: KEY_RIGHT,
+    pygame.K_UP: KEY_UP << 4,
+    pygame.K_DOWN: KEY_DOWN << 4,
+    pygame.K_LEFT: KEY_LEFT << 4,
+    pygame.K_RIGHT: KEY_RIGHT << 4,
+}
+
+# Every possible input message, pre-encoded and indexed by bitmask
+INPUT_CACHE = [
+    json_dumps({"type": "input", "keys": mask}) + b"\n"
+    for mask in range(16)
+]
+
+
+class Entity:
+    """Interpolation state for one player, updated in place on every snapshot."""
+
+    __slots__ = ("x_prev", "y_prev", "x", "y", "t", "score", "x_draw", "y_draw")
+
+    def __init__(self, x, y, score):
+        # First time we see this player: no interpolation yet, just set both prev and current.
+        self.x_prev = x
+        self.y_prev = y
+        self.x = x
+        self.y = y
+        self.t = 0.0
+        self.score = score
+        # Smoothed draw position for the local player (None until first drawn)
+        self.x_draw = None
+        self.y_draw = None
+
+
+def decode_frame(buffer, start, end):
+    """
+    Decode one frame body buffer[start:end].
+    Returns a message dict, or None if the frame is malformed.
+    """
+    msg_type = buffer[start]
+
+    if msg_type == MSG_STATE:
+        if end - start < STATE_HEADER.size:
+            return None
+        _, n_players, n_coins = STATE_HEADER.unpack_from(buffer, start)
+        offset = start + STATE_HEADER.size
+        players_end = offset + n_players * PLAYER_STRUCT.size
+        coins_end = players_end + n_coins * COIN_STRUCT.size
+        if coins_end > end:
+            return None
+
+        players = []
+        for pid, x, y, score in PLAYER_STRUCT.iter_unpack(buffer[offset:players_end]):
+            players.append({"id": pid, "x": x, "y": y, "score": score})
+        coins = []
+        for cid, x, y in COIN_STRUCT.iter_unpack(buffer[players_end:coins_end]):
+            coins.append({"id": cid, "x": x, "y": y})
+        return {"type": "state", "players": players, "coins": coins}
+
+    if msg_type == MSG_DELTA:
+        try:
+            return decode_delta(buffer, start, end)
+        except struct.error:
+            return None
+
+    # Everything else is a JSON control message
+    try:
+        return json_loads(bytes(buffer[start + 1:end]))
+    except ValueError:
+        return None
+
+
+def decode_delta(buffer, start, end):
+    """Decode a delta frame body; raises struct.error if it is truncated."""
+    body = memoryview(buffer)[start:end]
+    try:
+        _, n_changed, n_removed_players, n_removed_coins, n_added_coins = DELTA_HEADER.unpack_from(body, 0)
+        offset = DELTA_HEADER.size
+
+        changed = []
+        for _ in range(n_changed):
+            pid, flags = DELTA_PLAYER.unpack_from(body, offset)
+            offset += DELTA_PLAYER.size
+            change = {"id": pid}
+            if flags & DELTA_SMALL:
+                dx, dy = SMALL_MOVE.unpack_from(body, offset)
+                offset += SMALL_MOVE.size
+                change["dx"] = dx / DELTA_SCALE
+                change["dy"] = dy / DELTA_SCALE
+            elif flags & DELTA_FULL:
+                change["x"], change["y"] = FULL_MOVE.unpack_from(body, offset)
+                offset += FULL_MOVE.size
+            if flags & DELTA_SCORE:
+                (change["score"],) = SCORE_STRUCT.unpack_from(body, offset)
+                offset += SCORE_STRUCT.size
+            changed.append(change)
+
+        removed_players = []
+        for _ in range(n_removed_players):
+            removed_players.append(ID_STRUCT.unpack_from(body, offset)[0])
+            offset += ID_STRUCT.size
+
+        removed_coins = []
+        for _ in range(n_removed_coins):
+            removed_coins.append(ID_STRUCT.unpack_from(body, offset)[0])
+            offset += ID_STRUCT.size
+
+        added_coins = []
+        for _ in range(n_added_coins):
+            cid, x, y = COIN_STRUCT.unpack_from(body, offset)
+            offset += COIN_STRUCT.size
+            added_coins.append({"id": cid, "x": x, "y": y})
+    finally:
+        # Release the export so the caller can resize the buffer
+        body.release()
+
+    return {
+        "type": "delta",
+        "players": changed,
+        "removed_players": removed_players,
+        "removed_coins": removed_coins,
+        "added_coins": added_coins,
+    }
+
+
+def apply_delta(msg):
+    """Patch world_state with a decoded delta message."""
+    players = world_state["players"]
+    for change in msg["players"]:
+        pid = change["id"]
+        p = players.get(pid)
+        if p is None:
+            p = players[pid] = {"id": pid, "x": 0.0, "y": 0.0, "score": 0}
+        if "dx" in change:
+            p["x"] += change["dx"]
+            p["y"] += change["dy"]
+        elif "x" in change:
+            p["x"] = change["x"]
+            p["y"] = change["y"]
+        if "score" in change:
+            p["score"] = change["score"]
+    for pid in msg["removed_players"]:
+        players.pop(pid, None)
+
+    coins = world_state["coins"]
+    for cid in msg["removed_coins"]:
+        coins.pop(cid, None)
+    for c in msg["added_coins"]:
+        coins[c["id"]] = c
 
 
 def recv_messages(sock, buffer):
     """
     Non-blocking receive from server.
-    Returns (new_buffer, list_of_complete_json_messages)
+    Returns (buffer, list_of_complete_messages)
     """
     messages = []
 
@@ -34,7 +238,7 @@ def recv_messages(sock, buffer):
         if not data:
             # Connection closed from server side.
             return buffer, messages
-        buffer += data.decode("utf-8")
+        buffer.extend(data)
     except BlockingIOError:
         # No data available now (normal for non-blocking socket)
         return buffer, messages
@@ -45,32 +249,31 @@ def recv_messages(sock, buffer):
         # Some other socket error, ignore for now
         return buffer, messages
 
-    # Split by newline (each line is a JSON message)
-    while True:
-        if "\n" not in buffer:
+    # Each frame is a length prefix followed by the message body.
+    # Walk complete frames by offset and trim the buffer once at the end.
+    offset = 0
+    available = len(buffer)
+    while available - offset >= FRAME_HEADER.size:
+        (length,) = FRAME_HEADER.unpack_from(buffer, offset)
+        start = offset + FRAME_HEADER.size
+        end = start + length
+        if available < end:
             break
-        line, buffer = buffer.split("\n", 1)
-        line = line.strip()
-        if not line:
-            continue
-        try:
-            msg = json.loads(line)
+        msg = decode_frame(buffer, start, end) if length else None
+        if msg is not None:
             messages.append(msg)
-        except json.JSONDecodeError:
-            # ignore malformed
-            continue
+        offset = end
+
+    if offset:
+        del buffer[:offset]
 
     return buffer, messages
 
 
-def send_input(sock, keys):
-    msg = {
-        "type": "input",
-        "keys": keys,
-    }
-    data = json.dumps(msg) + "\n"
+def send_input(sock, keymask):
+    """Send a KEY_* input bitmask."""
     try:
-        sock.sendall(data.encode("utf-8"))
+        sock.sendall(INPUT_CACHE[keymask])
     except (BlockingIOError, BrokenPipeError, ConnectionResetError, OSError):
         # If we can't send this frame, just skip. Next frame will try again.
         pass
@@ -78,44 +281,33 @@ def send_input(sock, keys):
 
 def update_entities_from_server(players_list):
     """
-    Called whenever we get a new 'state' from server.
+    Called with the reconstructed world_state player dicts after every
+    full snapshot or delta from the server.
     Updates interpolation targets for each player.
     """
-    global entity_state
-
-    seen_ids = set()
-
     for p in players_list:
         pid = p["id"]
         x = float(p["x"])
         y = float(p["y"])
         score = p["score"]
-        seen_ids.add(pid)
-
-        if pid not in entity_state:
-            # First time we see this player: no interpolation yet, just set both prev and current.
-            entity_state[pid] = {
-                "x_prev": x,
-                "y_prev": y,
-                "x": x,
-                "y": y,
-                "t": 0.0,
-                "score": score,
-            }
+
+        ent = entity_state.get(pid)
+        if ent is None:
+            entity_state[pid] = Entity(x, y, score)
         else:
-            ent = entity_state[pid]
             # Shift current to prev, and set new target
-            ent["x_prev"] = ent["x"]
-            ent["y_prev"] = ent["y"]
-            ent["x"] = x
-            ent["y"] = y
-            ent["t"] = 0.0  # restart interpolation timer
-            ent["score"] = score
+            ent.x_prev = ent.x
+            ent.y_prev = ent.y
+            ent.x = x
+            ent.y = y
+            ent.t = 0.0  # restart interpolation timer
+            ent.score = score
 
     # Remove players that disappeared (disconnected)
-    to_delete = [pid for pid in entity_state.keys() if pid not in seen_ids]
-    for pid in to_delete:
-        del entity_state[pid]
+    if len(entity_state) != len(players_list):
+        seen_ids = {p["id"] for p in players_list}
+        for pid in [pid for pid in entity_state if pid not in seen_ids]:
+            del entity_state[pid]
 
 
 def main():
@@ -131,7 +323,7 @@ def main():
 
     # Send join message
     join_msg = {"type": "join", "name": "Player"}
-    sock.sendall((json.dumps(join_msg) + "\n").encode("utf-8"))
+    sock.sendall(json_dumps(join_msg) + b"\n")
     print("[CLIENT] Sent join message")
 
     # ----- Init pygame -----
@@ -139,67 +331,108 @@ def main():
     screen = pygame.display.set_mode((MAP_WIDTH, MAP_HEIGHT))
     pygame.display.set_caption("Coin Collector (Client)")
     clock = pygame.time.Clock()
+
+    # Only queue the events we handle; SDL drops the rest (e.g. mouse motion)
+    # before they ever become Python objects.
+    pygame.event.set_blocked(None)
+    pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.WINDOWFOCUSLOST])
     font = pygame.font.SysFont(None, 24)
 
+    # Sprites are drawn once and blitted every frame
+    coin_surf = pygame.Surface((20, 20), pygame.SRCALPHA).convert_alpha()
+    pygame.draw.circle(coin_surf, (255, 215, 0), (10, 10), 10)
+    self_surf = pygame.Surface((30, 30)).convert()
+    self_surf.fill((0, 255, 0))  # self
+    other_surf = pygame.Surface((30, 30)).convert()
+    other_surf.fill((0, 128, 255))  # others
+
+    # Score text is only re-rendered when it changes
+    score_key = None
+    score_surf = None
+
     running = True
-    recv_buffer = ""
+    recv_buffer = bytearray()
 
     # For smarter input sending (not every frame)
     last_input_keys = None
     send_timer = 0.0
+    held_keys = 0  # KEY_BINDINGS bits for keys currently down
+
+    # Measured interval between state updates
+    interp_duration = INTERP_DURATION
+    last_state_time = None
 
     while running:
         # Cap FPS to 60
         dt = clock.tick(60) / 1000.0
 
-        # --- Handle window events (keeps window responsive) ---
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-
-        # --- Handle keyboard input ---
-        pressed = pygame.key.get_pressed()
-        input_keys = {
-            "up": pressed[pygame.K_w] or pressed[pygame.K_UP],
-            "down": pressed[pygame.K_s] or pressed[pygame.K_DOWN],
-            "left": pressed[pygame.K_a] or pressed[pygame.K_LEFT],
-            "right": pressed[pygame.K_d] or pressed[pygame.K_RIGHT],
-        }
-
-        send_timer += dt
-        changed = (input_keys != last_input_keys)
-        if changed or send_timer >= 0.1:  # send at most 10x/sec, or on change
-            send_input(sock, input_keys)
-            last_input_keys = dict(input_keys)
-            send_timer = 0.0
-
         # --- Receive & process server messages (non-blocking) ---
         recv_buffer, msgs = recv_messages(sock, recv_buffer)
+        got_state = False
         for msg in msgs:
             mtype = msg.get("type")
             if mtype == "welcome":
                 my_id = msg.get("id")
                 print(f"[CLIENT] Assigned player ID: {my_id}")
             elif mtype == "state":
-                # Update coins
-                world_state["coins"] = msg.get("coins", [])
+                # Full snapshot replaces everything we knew
+                world_state["players"] = {p["id"]: p for p in msg["players"]}
+                world_state["coins"] = {c["id"]: c for c in msg["coins"]}
                 # Update interpolation state for players
-                players_list = msg.get("players", [])
-                update_entities_from_server(players_list)
+                update_entities_from_server(world_state["players"].values())
+                got_state = True
+            elif mtype == "delta":
+                apply_delta(msg)
+                update_entities_from_server(world_state["players"].values())
+                got_state = True
+
+        # Frames that arrive together count as one sample
+        if got_state:
+            now = time.monotonic()
+            if last_state_time is not None:
+                sample = min(
+                    max(now - last_state_time, INTERP_MIN_RATIO * interp_duration),
+                    INTERP_MAX_RATIO * interp_duration,
+                )
+                interp_duration += (sample - interp_duration) * INTERP_SMOOTHING
+            last_state_time = now
 
         # --- Advance interpolation timers ---
         for ent in entity_state.values():
-            ent["t"] += dt
+            ent.t += dt
+
+        # --- Handle window events (keeps window responsive) ---
+        # Input is sampled after network processing, right before it is sent,
+        # so the freshest keyboard state goes out on the wire.
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                held_keys |= KEY_BINDINGS.get(event.key, 0)
+            elif event.type == pygame.KEYUP:
+                held_keys &= ~KEY_BINDINGS.get(event.key, 0)
+            elif event.type == pygame.WINDOWFOCUSLOST:
+                # Key-up events won't arrive while unfocused
+                held_keys = 0
+
+        # --- Handle keyboard input ---
+        input_keys = (held_keys | held_keys >> 4) & 0xF
+
+        send_timer += dt
+        changed = (input_keys != last_input_keys)
+        if changed or send_timer >= 0.1:  # send at most 10x/sec, or on change
+            send_input(sock, input_keys)
+            last_input_keys = input_keys
+            send_timer = 0.0
 
         # --- Draw ---
         screen.fill((30, 30, 30))
 
-        coins = world_state["coins"]
+        coins = world_state["coins"].values()
 
         # Draw coins
         for c in coins:
-            x, y = int(c["x"]), int(c["y"])
-            pygame.draw.circle(screen, (255, 215, 0), (x, y), 10)
+            screen.blit(coin_surf, (int(c["x"]) - 10, int(c["y"]) - 10))
 
         # Draw players
         my_score = 0
@@ -207,40 +440,34 @@ def main():
             # For remote players: interpolate between prev and current
             if pid != my_id:
             # Interpolation for remote players
-                alpha = min(ent["t"] / INTERP_DURATION, 1.0)
-                x_draw = ent["x_prev"] + (ent["x"] - ent["x_prev"]) * alpha
-                y_draw = ent["y_prev"] + (ent["y"] - ent["y_prev"]) * alpha
+                alpha = min(ent.t / interp_duration, 1.0)
+                x_draw = ent.x_prev + (ent.x - ent.x_prev) * alpha
+                y_draw = ent.y_prev + (ent.y - ent.y_prev) * alpha
             else:
                 # Smooth correction for local player
                 # Instead of snapping, blend toward authoritative position
                 correct_speed = 0.15  # lower = smoother, higher = snappier
-                x_draw = ent.get("x_draw", ent["x"])
-                y_draw = ent.get("y_draw", ent["y"])
+                x_draw = ent.x if ent.x_draw is None else ent.x_draw
+                y_draw = ent.y if ent.y_draw is None else ent.y_draw
 
                 # blend current visual pos toward authoritative pos
-                x_draw += (ent["x"] - x_draw) * correct_speed
-                y_draw += (ent["y"] - y_draw) * correct_speed
+                x_draw += (ent.x - x_draw) * correct_speed
+                y_draw += (ent.y - y_draw) * correct_speed
 
                 # save back into entity state for next frame
-                ent["x_draw"] = x_draw
-                ent["y_draw"] = y_draw
-
-                my_score = ent["score"]
+                ent.x_draw = x_draw
+                ent.y_draw = y_draw
 
-            if pid == my_id:
-                color = (0, 255, 0)  # self
-            else:
-                color = (0, 128, 255)  # others
+                my_score = ent.score
 
-            pygame.draw.rect(
-                screen,
-                color,
-                pygame.Rect(int(x_draw) - 15, int(y_draw) - 15, 30, 30),
-            )
+            surf = self_surf if pid == my_id else other_surf
+            screen.blit(surf, (int(x_draw) - 15, int(y_draw) - 15))
 
         # Score text
-        score_text = font.render(f"Your ID: {my_id}  Score: {my_score}", True, (255, 255, 255))
-        screen.blit(score_text, (10, 10))
+        if score_key != (my_id, my_score):
+            score_key = (my_id, my_score)
+            score_surf = font.render(f"Your ID: {my_id}  Score: {my_score}", True, (255, 255, 255))
+        screen.blit(score_surf, (10, 10))
 
         pygame.display.flip()
 
@@ -1,9 +1,24 @@
 import socket
-import threading
+import selectors
 import json
+import struct
 import time
 import random
 import math
+import heapq
+import itertools
+from array import array
+from collections import defaultdict, deque
+
+try:
+    # Optional speedup; same API shape as the stdlib fallback below
+    from orjson import dumps as json_dumps, loads as json_loads
+except ImportError:
+    def json_dumps(obj):
+        """Serialize obj to UTF-8 JSON bytes."""
+        return json.dumps(obj).encode("utf-8")
+
+    json_loads = json.loads
 
 HOST = "127.0.0.1"
 PORT = 8765
@@ -12,6 +27,8 @@ TICK_RATE = 20           # 20 updates per second
 DT = 1.0 / TICK_RATE
 INCOMING_LATENCY = 0.1   # 100ms on messages from client
 OUTGOING_LATENCY = 0.1   # 100ms on messages to client
+SEND_BUFFER_SIZE = 256 * 1024  # per-connection kernel send buffer
+ACCEPT_RETRY_DELAY = 1.0       # pause accepting this long after e.g. EMFILE
 
 MAP_WIDTH = 800
 MAP_HEIGHT = 600
@@ -21,210 +38,544 @@ COIN_RADIUS = 15
 
 MAX_COINS = 5
 
-players = {}             # conn -> player dict
-players_lock = threading.Lock()
-
-coins = []               # list of {id, x, y}
-coins_lock = threading.Lock()
+# Input bitmask
+KEY_UP = 1
+KEY_DOWN = 2
+KEY_LEFT = 4
+KEY_RIGHT = 8
+
+
+def build_dir_table():
+    """Normalized (dx, dy) movement direction for every input bitmask."""
+    table = []
+    for mask in range(16):
+        dx = float(bool(mask & KEY_RIGHT) - bool(mask & KEY_LEFT))
+        dy = float(bool(mask & KEY_DOWN) - bool(mask & KEY_UP))
+        length = math.hypot(dx, dy)
+        if length > 0:
+            dx /= length
+            dy /= length
+        table.append((dx, dy))
+    return table
+
+
+DIR_TABLE = build_dir_table()
+
+# Collision broad phase: coins are bucketed into cells one pickup radius wide,
+# so any coin a player can touch lies in the 3x3 cells around them.
+PICKUP_RADIUS = PLAYER_RADIUS + COIN_RADIUS
+PICKUP_RADIUS_SQ = PICKUP_RADIUS * PICKUP_RADIUS
+CELL_SIZE = PICKUP_RADIUS
+
+# --- Wire protocol (server -> client) ---
+# Every frame is a 4-byte big-endian length followed by a 1-byte message type.
+# Control messages carry a JSON body; state snapshots are packed binary records.
+# A client gets one full snapshot after joining, then a delta every tick.
+MSG_WELCOME = 1
+MSG_STATE = 2
+MSG_DELTA = 3
+
+FRAME_HEADER = struct.Struct(">I")      # frame length
+STATE_HEADER = struct.Struct("<BHH")    # msg type, player count, coin count
+PLAYER_FMT = "<Iffi"                    # id, x, y, score (16 bytes)
+COIN_FMT = "<Iff"                       # id, x, y (12 bytes)
+PLAYER_STRUCT = struct.Struct(PLAYER_FMT)
+COIN_STRUCT = struct.Struct(COIN_FMT)
+
+# Delta frame: header, changed players, removed player ids, removed coin ids,
+# added coin records. Each changed player is an id + flags record followed by
+# the fields its flags select.
+DELTA_HEADER = struct.Struct("<BHHHH")  # msg type, changed, removed players, removed coins, added coins
+DELTA_PLAYER = struct.Struct("<IB")     # id, flags
+SMALL_MOVE = struct.Struct("<bb")       # dx, dy in 1/DELTA_SCALE pixels
+FULL_MOVE = struct.Struct("<ff")        # x, y
+SCORE_STRUCT = struct.Struct("<i")      # score
+ID_STRUCT = struct.Struct("<I")         # player or coin id
+
+DELTA_SMALL = 1                         # SMALL_MOVE follows
+DELTA_FULL = 2                          # FULL_MOVE follows
+DELTA_SCORE = 4                         # SCORE_STRUCT follows
+DELTA_SCALE = 4                         # quarter-pixel position deltas
+
+# Player state is stored structure-of-arrays: one entry per slot, and slots
+# stay dense (a leaving player's slot is refilled by the last one). Numeric
+# columns are typed arrays, so the tick works on contiguous unboxed values.
+players = {}             # conn -> slot index
+slot_conns = []          # slot -> conn
+player_ids = array("I")
+player_x = array("f")
+player_y = array("f")
+player_score = array("i")
+player_input = array("B")  # bitmask of KEY_* flags
+coins = []               # list of {id, x, y}; never mutated after spawn
+coins_payload_cache = None  # packed COIN_STRUCT records for coins, None when stale
+clients = {}             # conn -> {"addr", "rbuf", "wbuf"}
+
+# What clients were last told; deltas are computed against this baseline.
+# Positions track the quantized values the clients reconstruct, not the
+# exact simulation values, so rounding never accumulates.
+sent_players = {}        # player id -> [x, y, score]
+sent_coins = set()       # coin ids
+synced = set()           # conns that hold the baseline and receive deltas
+
+# Artificial latency queues, keyed on time.monotonic()
+pending = []             # heap of (ready_at, seq, conn, msg) from clients
+pending_seq = itertools.count()
+outbox = deque()         # (send_at, conns, data) to clients, in send order
+
+sel = selectors.DefaultSelector()
+
+# Scatter-gather sends aren't available everywhere (e.g. Windows)
+HAVE_SENDMSG = hasattr(socket.socket, "sendmsg")
 
 next_player_id = 1
 next_coin_id = 1
+last_spawn_time = 0.0
+accept_resume_at = None  # set while accepting is paused
+
+
+def frame(body):
+    """Prefix a message body with its length."""
+    return FRAME_HEADER.pack(len(body)) + body
+
+
+def encode_control(msg_type, obj):
+    """Encode a JSON control message (e.g. welcome) as a frame."""
+    return frame(bytes((msg_type,)) + json_dumps(obj))
+
+
+def encode_coins():
+    """Pack every coin as COIN_STRUCT records."""
+    return b"".join(COIN_STRUCT.pack(c["id"], c["x"], c["y"]) for c in coins)
+
+
+def encode_state():
+    """Encode the baseline players and current coins as a full snapshot frame."""
+    global coins_payload_cache
+    if coins_payload_cache is None:
+        coins_payload_cache = encode_coins()
+
+    parts = [STATE_HEADER.pack(MSG_STATE, len(sent_players), len(coins))]
+    for pid, (x, y, score) in sent_players.items():
+        parts.append(PLAYER_STRUCT.pack(pid, x, y, score))
+    parts.append(coins_payload_cache)
+    return frame(b"".join(parts))
+
+
+def encode_delta():
+    """Encode changes since the last broadcast as a frame and advance the baseline."""
+    changed = []
+    n_changed = 0
+    for slot, pid in enumerate(player_ids):
+        x, y, score = player_x[slot], player_y[slot], player_score[slot]
+        sent = sent_players.get(pid)
+        if sent is None:
+            # New player: clients need everything
+            sent = sent_players[pid] = [0.0, 0.0, None]
+            flags = DELTA_FULL
+        else:
+            flags = 0
+            qx = round((x - sent[0]) * DELTA_SCALE)
+            qy = round((y - sent[1]) * DELTA_SCALE)
+            if qx or qy:
+                if -128 <= qx <= 127 and -128 <= qy <= 127:
+                    flags = DELTA_SMALL
+                else:
+                    flags = DELTA_FULL
+        if score != sent[2]:
+            flags |= DELTA_SCORE
+        if not flags:
+            continue
+
+        n_changed += 1
+        changed.append(DELTA_PLAYER.pack(pid, flags))
+        if flags & DELTA_SMALL:
+            changed.append(SMALL_MOVE.pack(qx, qy))
+            sent[0] += qx / DELTA_SCALE
+            sent[1] += qy / DELTA_SCALE
+        elif flags & DELTA_FULL:
+            # Snap to the delta grid; grid values are exact in float32, so
+            # the snapshot a late joiner gets matches everyone's baseline.
+            sent[0] = round(x * DELTA_SCALE) / DELTA_SCALE
+            sent[1] = round(y * DELTA_SCALE) / DELTA_SCALE
+            changed.append(FULL_MOVE.pack(sent[0], sent[1]))
+        if flags & DELTA_SCORE:
+            changed.append(SCORE_STRUCT.pack(score))
+            sent[2] = score
+
+    removed_players = []
+    if len(sent_players) != len(player_ids):
+        current = set(player_ids)
+        removed_players = [pid for pid in sent_players if pid not in current]
+        for pid in removed_players:
+            del sent_players[pid]
+
+    current_coins = {c["id"] for c in coins}
+    removed_coins = sent_coins - current_coins
+    added_coins = [c for c in coins if c["id"] not in sent_coins]
+    sent_coins.clear()
+    sent_coins.update(current_coins)
+
+    parts = [DELTA_HEADER.pack(
+        MSG_DELTA, n_changed, len(removed_players), len(removed_coins), len(added_coins)
+    )]
+    parts.extend(changed)
+    for pid in removed_players:
+        parts.append(ID_STRUCT.pack(pid))
+    for cid in removed_coins:
+        parts.append(ID_STRUCT.pack(cid))
+    for c in added_coins:
+        parts.append(COIN_STRUCT.pack(c["id"], c["x"], c["y"]))
+    return frame(b"".join(parts))
+
+
+def queue_send(conns, data):
+    """Schedule a frame for delivery after the outgoing latency."""
+    # Outgoing latency (server -> client)
+    outbox.append((time.monotonic() + OUTGOING_LATENCY, conns, data))
+
+
+def send_frames(conn, frames):
+    """
+    Send a batch of encoded frames in one gathered write,
+    buffering whatever the socket won't take yet.
+    """
+    client = clients.get(conn)
+    if client is None:
+        return
+    wbuf = client["wbuf"]
+    if wbuf:
+        # Earlier output is still pending; keep ordering
+        for data in frames:
+            wbuf.extend(data)
+        return
 
-
-def send_message(conn, obj):
-    """Send a JSON message with artificial latency."""
-    data = json.dumps(obj) + "\n"
     try:
-        # Outgoing latency (server -> client)
-        time.sleep(OUTGOING_LATENCY)
-        conn.sendall(data.encode("utf-8"))
-    except Exception:
-        # Connection might be closed; ignore
-        pass
+        if HAVE_SENDMSG:
+            sent = conn.sendmsg(frames)
+        else:
+            sent = conn.send(b"".join(frames))
+    except BlockingIOError:
+        sent = 0
+    except OSError:
+        close_client(conn)
+        return
+
+    if sent == sum(map(len, frames)):
+        return
+    wbuf.extend(b"".join(frames)[sent:])
+    sel.modify(conn, selectors.EVENT_READ | selectors.EVENT_WRITE)
+
+
+def flush_outbox(now):
+    """Deliver every due frame, one gathered write per connection."""
+    batches = defaultdict(list)
+    while outbox and outbox[0][0] <= now:
+        _, conns, data = outbox.popleft()
+        for conn in conns:
+            batches[conn].append(data)
+    for conn, frames in batches.items():
+        send_frames(conn, frames)
+
+
+def flush_client(conn):
+    """Write buffered output once the socket becomes writable."""
+    wbuf = clients[conn]["wbuf"]
+    try:
+        sent = conn.send(wbuf)
+    except BlockingIOError:
+        return
+    except OSError:
+        close_client(conn)
+        return
+    del wbuf[:sent]
+    if not wbuf:
+        sel.modify(conn, selectors.EVENT_READ)
 
 
 def spawn_coin():
     """Spawn a single coin at a random position."""
-    global next_coin_id
+    global next_coin_id, coins_payload_cache
     x = random.randint(50, MAP_WIDTH - 50)
     y = random.randint(50, MAP_HEIGHT - 50)
     coin = {"id": next_coin_id, "x": x, "y": y}
     next_coin_id += 1
     coins.append(coin)
+    coins_payload_cache = None
+
+
+def add_player(conn, player_id, x, y):
+    """Append a player in a new slot."""
+    players[conn] = len(slot_conns)
+    slot_conns.append(conn)
+    player_ids.append(player_id)
+    player_x.append(x)
+    player_y.append(y)
+    player_score.append(0)
+    player_input.append(0)
+
+
+def remove_player(conn):
+    """Remove a player, moving the last slot into the freed one."""
+    synced.discard(conn)
+    slot = players.pop(conn, None)
+    if slot is None:
+        return
+    last = len(slot_conns) - 1
+    if slot != last:
+        moved = slot_conns[last]
+        players[moved] = slot
+        for column in (slot_conns, player_ids, player_x, player_y, player_score, player_input):
+            column[slot] = column[last]
+    for column in (slot_conns, player_ids, player_x, player_y, player_score, player_input):
+        column.pop()
+
+
+def accept_client(server_sock):
+    """Accept a new connection and register it with the selector."""
+    global accept_resume_at
+    try:
+        conn, addr = server_sock.accept()
+    except (BlockingIOError, ConnectionAbortedError):
+        # Spurious wakeup, or the peer reset before we got to it
+        return
+    except OSError as e:
+        # e.g. EMFILE. The listen socket stays readable, so stop watching it
+        # for a while instead of spinning; existing clients keep being served.
+        print(f"[SERVER] Error accepting connection: {e}")
+        sel.unregister(server_sock)
+        accept_resume_at = time.monotonic() + ACCEPT_RETRY_DELAY
+        return
 
-
-def handle_client(conn, addr):
-    """Handle input from a single client."""
-    global next_player_id
     print(f"[SERVER] New connection from {addr}")
-    f = conn.makefile("r")
-    player_id = None
-
     try:
-        for line in f:
-            line = line.strip()
-            if not line:
-                break
-
-            # Incoming latency (client -> server)
-            time.sleep(INCOMING_LATENCY)
-
-            try:
-                msg = json.loads(line)
-            except json.JSONDecodeError:
-                continue
-
-            mtype = msg.get("type")
-
-            if mtype == "join":
-                # Register a new player
-                with players_lock:
-                    player_id = next_player_id
-                    next_player_id += 1
-                    start_x = random.randint(100, MAP_WIDTH - 100)
-                    start_y = random.randint(100, MAP_HEIGHT - 100)
-                    players[conn] = {
-                        "id": player_id,
-                        "x": float(start_x),
-                        "y": float(start_y),
-                        "score": 0,
-                        "input": {"up": False, "down": False, "left": False, "right": False},
-                    }
-                print(f"[SERVER] Player {player_id} joined from {addr}")
-
-                # Send welcome message with assigned ID
-                send_message(conn, {"type": "welcome", "id": player_id})
-
-            elif mtype == "input" and player_id is not None:
-                keys = msg.get("keys", {})
-                with players_lock:
-                    p = players.get(conn)
-                    if p:
-                        p["input"] = {
-                            "up": bool(keys.get("up", False)),
-                            "down": bool(keys.get("down", False)),
-                            "left": bool(keys.get("left", False)),
-                            "right": bool(keys.get("right", False)),
-                        }
-
-    except Exception as e:
+        conn.setblocking(False)
+        # State frames are small and latency-sensitive; don't let Nagle hold them
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER_SIZE)
+    except OSError as e:
+        # The socket can already be reset on some platforms
         print(f"[SERVER] Error with client {addr}: {e}")
-
-    finally:
-        print(f"[SERVER] Connection closed from {addr}")
-        with players_lock:
-            if conn in players:
-                del players[conn]
         conn.close()
+        return
+    clients[conn] = {"addr": addr, "rbuf": bytearray(), "wbuf": bytearray()}
+    sel.register(conn, selectors.EVENT_READ)
 
 
-def game_loop():
-    """Authoritative game loop: movement, coins, collisions, broadcasting."""
-    last_spawn_time = time.time()
+def close_client(conn):
+    """Drop a connection and its player."""
+    client = clients.pop(conn, None)
+    if client is None:
+        return
+    print(f"[SERVER] Connection closed from {client['addr']}")
+    remove_player(conn)
+    sel.unregister(conn)
+    conn.close()
 
+
+def drop_client(conn, error):
+    """Log an unexpected error from one client and close its connection."""
+    client = clients.get(conn)
+    if client is not None:
+        print(f"[SERVER] Error with client {client['addr']}: {error}")
+    close_client(conn)
+
+
+def read_client(conn):
+    """Read available bytes and queue every complete line."""
+    client = clients[conn]
+    try:
+        data = conn.recv(65536)
+    except BlockingIOError:
+        return
+    except OSError as e:
+        print(f"[SERVER] Error with client {client['addr']}: {e}")
+        close_client(conn)
+        return
+    if not data:
+        close_client(conn)
+        return
+
+    rbuf = client["rbuf"]
+    # Bytes before len(rbuf) were already searched and hold no newline
+    search_from = len(rbuf)
+    rbuf.extend(data)
+
+    start = 0
     while True:
-        start_time = time.time()
-
-        # Spawn coins periodically
-        with coins_lock:
-            now = time.time()
-            if len(coins) < MAX_COINS and (now - last_spawn_time) > 2.0:
-                spawn_coin()
-                last_spawn_time = now
-
-        # Snapshot players
-        with players_lock:
-            player_items = list(players.items())
-
-        # Update player positions based on last input
-        for conn, p in player_items:
-            keys = p["input"]
-            dx = 0.0
-            dy = 0.0
-            if keys.get("up"):
-                dy -= 1
-            if keys.get("down"):
-                dy += 1
-            if keys.get("left"):
-                dx -= 1
-            if keys.get("right"):
-                dx += 1
-
-            length = math.hypot(dx, dy)
-            if length > 0:
-                dx /= length
-                dy /= length
-
-            p["x"] += dx * PLAYER_SPEED * DT
-            p["y"] += dy * PLAYER_SPEED * DT
-
-            # Clamp to map boundaries
-            p["x"] = max(PLAYER_RADIUS, min(MAP_WIDTH - PLAYER_RADIUS, p["x"]))
-            p["y"] = max(PLAYER_RADIUS, min(MAP_HEIGHT - PLAYER_RADIUS, p["y"]))
-
-        # Handle collisions with coins
-        with coins_lock:
-            to_remove = set()
-            for coin in coins:
-                cx, cy = coin["x"], coin["y"]
-                for conn, p in player_items:
-                    px, py = p["x"], p["y"]
-                    dist = math.hypot(px - cx, py - cy)
-                    if dist < (PLAYER_RADIUS + COIN_RADIUS):
-                        # Player collects coin
-                        p["score"] += 1
-                        to_remove.add(coin["id"])
-                        break  # coin already collected
-
-            if to_remove:
-                coins[:] = [c for c in coins if c["id"] not in to_remove]
-
-        # Build state snapshot
-        with coins_lock:
-            coins_snapshot = [dict(c) for c in coins]
-
-        players_snapshot = []
-        for conn, p in player_items:
-            players_snapshot.append(
-                {
-                    "id": p["id"],
-                    "x": p["x"],
-                    "y": p["y"],
-                    "score": p["score"],
-                }
-            )
-
-        state_msg = {
-            "type": "state",
-            "players": players_snapshot,
-            "coins": coins_snapshot,
-        }
-
-        # Broadcast state to all players
-        for conn, p in player_items:
-            send_message(conn, state_msg)
-
-        # Maintain tick rate
-        elapsed = time.time() - start_time
-        sleep_time = DT - elapsed
-        if sleep_time > 0:
-            time.sleep(sleep_time)
+        nl = rbuf.find(b"\n", search_from)
+        if nl < 0:
+            break
+        line = bytes(rbuf[start:nl]).strip()
+        start = search_from = nl + 1
+        if not line:
+            continue
+
+        try:
+            msg = json_loads(line)
+        except (ValueError, RecursionError):
+            # Malformed JSON, invalid UTF-8, or nesting too deep for the stdlib parser
+            continue
+        if not isinstance(msg, dict):
+            continue
+
+        # Incoming latency (client -> server)
+        heapq.heappush(pending, (time.monotonic() + INCOMING_LATENCY, next(pending_seq), conn, msg))
+
+    if start:
+        del rbuf[:start]
+
+
+def handle_message(conn, msg):
+    """Apply a single client message."""
+    global next_player_id
+    client = clients.get(conn)
+    if client is None:
+        return
+
+    mtype = msg.get("type")
+
+    if mtype == "join" and conn not in players:
+        # Register a new player
+        player_id = next_player_id
+        next_player_id += 1
+        start_x = random.randint(100, MAP_WIDTH - 100)
+        start_y = random.randint(100, MAP_HEIGHT - 100)
+        add_player(conn, player_id, float(start_x), float(start_y))
+        print(f"[SERVER] Player {player_id} joined from {client['addr']}")
+
+        # Send welcome message with assigned ID
+        queue_send((conn,), encode_control(MSG_WELCOME, {"type": "welcome", "id": player_id}))
+
+    elif mtype == "input":
+        keys = msg.get("keys", 0)
+        slot = players.get(conn)
+        if slot is not None and isinstance(keys, int):
+            player_input[slot] = keys & (KEY_UP | KEY_DOWN | KEY_LEFT | KEY_RIGHT)
+
+
+def game_tick():
+    """Authoritative game tick: movement, coins, collisions, broadcasting."""
+    global last_spawn_time, coins_payload_cache
+
+    now = time.monotonic()
+
+    # Apply client messages whose simulated latency has elapsed
+    while pending and pending[0][0] <= now:
+        _, _, conn, msg = heapq.heappop(pending)
+        try:
+            handle_message(conn, msg)
+        except Exception as e:
+            drop_client(conn, e)
+
+    # Spawn coins periodically
+    if len(coins) < MAX_COINS and (now - last_spawn_time) > 2.0:
+        spawn_coin()
+        last_spawn_time = now
+
+    # Update player positions based on last input
+    step = PLAYER_SPEED * DT
+    for slot, mask in enumerate(player_input):
+        if not mask:
+            continue
+        dx, dy = DIR_TABLE[mask]
+
+        # Clamp to map boundaries
+        player_x[slot] = max(PLAYER_RADIUS, min(MAP_WIDTH - PLAYER_RADIUS, player_x[slot] + dx * step))
+        player_y[slot] = max(PLAYER_RADIUS, min(MAP_HEIGHT - PLAYER_RADIUS, player_y[slot] + dy * step))
+
+    # Handle collisions with coins
+    grid = defaultdict(list)
+    for coin in coins:
+        grid[(int(coin["x"]) // CELL_SIZE, int(coin["y"]) // CELL_SIZE)].append(coin)
+
+    to_remove = set()
+    for slot in range(len(player_ids)):
+        px, py = player_x[slot], player_y[slot]
+        gx, gy = int(px) // CELL_SIZE, int(py) // CELL_SIZE
+        for cell in (
+            (gx - 1, gy - 1), (gx, gy - 1), (gx + 1, gy - 1),
+            (gx - 1, gy), (gx, gy), (gx + 1, gy),
+            (gx - 1, gy + 1), (gx, gy + 1), (gx + 1, gy + 1),
+        ):
+            for coin in grid.get(cell, ()):
+                if coin["id"] in to_remove:
+                    continue  # coin already collected
+                dx = px - coin["x"]
+                dy = py - coin["y"]
+                if dx * dx + dy * dy < PICKUP_RADIUS_SQ:
+                    # Player collects coin
+                    player_score[slot] += 1
+                    to_remove.add(coin["id"])
+
+    if to_remove:
+        coins[:] = [c for c in coins if c["id"] not in to_remove]
+        coins_payload_cache = None
+
+    delta_msg = encode_delta()
+
+    # Broadcast to all players: one shared outgoing delay per tick.
+    # Players who joined this tick get a full snapshot of the new baseline instead.
+    newcomers = tuple(conn for conn in slot_conns if conn not in synced)
+    if newcomers:
+        queue_send(tuple(conn for conn in slot_conns if conn in synced), delta_msg)
+        queue_send(newcomers, encode_state())
+        synced.update(newcomers)
+    else:
+        queue_send(tuple(slot_conns), delta_msg)
+
+
+def poll_sockets(server_sock, timeout):
+    """Wait up to timeout for socket events and dispatch them."""
+    for key, mask in sel.select(timeout=timeout):
+        conn = key.fileobj
+        if conn is server_sock:
+            accept_client(server_sock)
+            continue
+        # A failure on one connection only drops that connection
+        try:
+            if mask & selectors.EVENT_READ:
+                read_client(conn)
+            if mask & selectors.EVENT_WRITE and conn in clients:
+                flush_client(conn)
+        except Exception as e:
+            drop_client(conn, e)
 
 
 def start_server():
+    global last_spawn_time, accept_resume_at
     print(f"[SERVER] Starting on {HOST}:{PORT}")
-    game_thread = threading.Thread(target=game_loop, daemon=True)
-    game_thread.start()
 
     with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
         s.bind((HOST, PORT))
         s.listen()
+        s.setblocking(False)
+        sel.register(s, selectors.EVENT_READ)
         print("[SERVER] Waiting for connections ...")
 
+        last_spawn_time = time.monotonic()
+        next_tick = time.monotonic()
+
         while True:
-            conn, addr = s.accept()
-            client_thread = threading.Thread(target=handle_client, args=(conn, addr), daemon=True)
-            client_thread.start()
+            # Sleep until the next tick or the next outgoing frame, whichever is first
+            wake_at = next_tick
+            if outbox:
+                wake_at = min(wake_at, outbox[0][0])
+
+            poll_sockets(s, max(0.0, wake_at - time.monotonic()))
+
+            now = time.monotonic()
+            if now >= next_tick:
+                # game_tick applies every input that is already due before stepping
+                game_tick()
+                # Maintain tick rate; don't try to catch up after a stall
+                next_tick = max(next_tick + DT, now)
+
+            flush_outbox(time.monotonic())
+
+            if accept_resume_at is not None and time.monotonic() >= accept_resume_at:
+                sel.register(s, selectors.EVENT_READ)
+                accept_resume_at = None
 
 
 if __name__ == "__main__":